@@ -35,9 +35,17 @@ echo 🔧 Activating virtual environment...
 call "%VENV_DIR%\Scripts\activate.bat"
 if errorlevel 1 ( call :error_exit "Failed to activate virtual environment." )
 
-echo 📦 Installing/updating dependencies from requirements.txt...
-pip install -r requirements.txt
-if errorlevel 1 ( call :error_exit "Failed to install dependencies." )
+REM Only reinstall dependencies when requirements.txt changed since the last install
+set "REQUIREMENTS_STAMP=%VENV_DIR%\requirements-installed.txt"
+fc /b requirements.txt "%REQUIREMENTS_STAMP%" >nul 2>&1
+if errorlevel 1 (
+    echo 📦 Installing/updating dependencies from requirements.txt...
+    pip install -r requirements.txt
+    if errorlevel 1 ( call :error_exit "Failed to install dependencies." )
+    copy /y requirements.txt "%REQUIREMENTS_STAMP%" >nul
+) else (
+    echo ✅ Dependencies up to date
+)
 
 REM Check for model files
 set "MODELS_DIR=src\models"
@@ -48,8 +56,8 @@ if not exist "%MODELS_DIR%\kmeans_model.pkl" ( echo    - Missing: %MODELS_DIR%\k
 if not exist "%MODELS_DIR%\pca_transformer.pkl" ( echo    - Missing: %MODELS_DIR%\pca_transformer.pkl & set "MISSING_MODELS=1" )
 if not exist "%MODELS_DIR%\standard_scaler.pkl" ( echo    - Missing: %MODELS_DIR%\standard_scaler.pkl & set "MISSING_MODELS=1" )
 if not exist "%MODELS_DIR%\minmax_scaler_tempo.pkl" ( echo    - Missing: %MODELS_DIR%\minmax_scaler_tempo.pkl & set "MISSING_MODELS=1" )
-if not exist "%MODELS_DIR%\df_pca.pkl" ( echo    - Missing: %MODELS_DIR%\df_pca.pkl & set "MISSING_MODELS=1" )
-if not exist "%MODELS_DIR%\df_clean.pkl" ( echo    - Missing: %MODELS_DIR%\df_clean.pkl & set "MISSING_MODELS=1" )
+if not exist "%MODELS_DIR%\df_pca.pkl" if not exist "%MODELS_DIR%\df_pca.arrow" ( echo    - Missing: %MODELS_DIR%\df_pca.pkl & set "MISSING_MODELS=1" )
+if not exist "%MODELS_DIR%\df_clean.pkl" if not exist "%MODELS_DIR%\df_clean.arrow" ( echo    - Missing: %MODELS_DIR%\df_clean.pkl & set "MISSING_MODELS=1" )
 if not exist "%MODELS_DIR%\top_features.txt" ( echo    - Missing: %MODELS_DIR%\top_features.txt & set "MISSING_MODELS=1" )
 
 if "%MISSING_MODELS%" == "1" (
@@ -34,8 +34,15 @@ echo "🔧 Activating virtual environment..."
 # shellcheck disable=SC1091
 source "$VENV_DIR/bin/activate" || error_exit "Failed to activate virtual environment."
 
-echo "📦 Installing/updating dependencies from requirements.txt..."
-pip install -r requirements.txt || error_exit "Failed to install dependencies."
+# Only reinstall dependencies when requirements.txt changed since the last install
+REQUIREMENTS_STAMP="$VENV_DIR/.requirements-installed"
+if [ ! -f "$REQUIREMENTS_STAMP" ] || [ requirements.txt -nt "$REQUIREMENTS_STAMP" ]; then
+    echo "📦 Installing/updating dependencies from requirements.txt..."
+    pip install -r requirements.txt || error_exit "Failed to install dependencies."
+    touch "$REQUIREMENTS_STAMP"
+else
+    echo "✅ Dependencies up to date"
+fi
 
 # Check for model files
 MODELS_DIR="src/models"
@@ -50,7 +57,12 @@ REQUIRED_MODELS=(
 )
 MISSING_MODELS=0
 for model_file in "${REQUIRED_MODELS[@]}"; do
-    if [ ! -f "$MODELS_DIR/$model_file" ]; then
+    # DataFrames may ship as memory-mappable Arrow files instead of pickles
+    arrow_file=""
+    case "$model_file" in
+        df_*.pkl) arrow_file="$MODELS_DIR/${model_file%.pkl}.arrow" ;;
+    esac
+    if [ ! -f "$MODELS_DIR/$model_file" ] && [ ! -f "$arrow_file" ]; then
         echo "   - Missing: $MODELS_DIR/$model_file"
         MISSING_MODELS=1
     fi
@@ -89,4 +101,5 @@ echo "⏹️  Press Ctrl+C to stop the server."
 echo ""
 
 cd src/web
-python3 app.py
+# Replace the shell with the app so signals reach Python directly
+exec python3 app.py
@@ -6,12 +6,19 @@ from spotipy.oauth2 import SpotifyClientCredentials
 import numpy as np
 import time
 import json
-from pathlib import Path
 from dotenv import load_dotenv
 import random
+import threading
 import warnings
 from typing import Dict, List, Optional, Tuple, Any, Union
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+except ImportError:  # Optional: fall back to the pickled DataFrames
+    pa = None
+
 # Suppress mathematical warnings globally for cleaner output
 warnings.filterwarnings('ignore', category=RuntimeWarning)
 warnings.filterwarnings('ignore', category=UserWarning)
@@ -22,16 +29,33 @@ load_dotenv()
 
 # Constants
 CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "song_features_cache.json")
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+ARROW_DATAFRAMES = ('df_pca', 'df_clean')
+ARROW_AVAILABLE = pa is not None
+PCA_FEATURES_COLUMN = 'pca_features'
+METADATA_COLUMNS = ['track_name', 'artist_name', 'genre', 'popularity']
+FALLBACK_ATTR = 'used_fallback'
 MAX_RETRIES = 3
 INITIAL_RETRY_DELAY = 1
 API_RATE_LIMIT_PAUSE = 0.5
 
+# Components are loaded once per process and shared by every caller
+_components = None
+_components_lock = threading.Lock()
+
+# Per-cluster feature matrices and KD-trees, built once for the loaded df_pca
+_cluster_source = None
+_cluster_matrices: Dict[Any, Tuple[pd.Index, np.ndarray]] = {}
+_cluster_trees: Dict[Any, Tuple[np.ndarray, Any]] = {}
+_cluster_lock = threading.Lock()
+
 def load_song_cache() -> Dict[str, Dict[str, Any]]:
     """Load the song features cache from disk"""
     try:
-        if Path(CACHE_PATH).exists():
-            with open(CACHE_PATH, 'r') as f:
-                return json.load(f)
+        # Open directly rather than probing for the file first
+        with open(CACHE_PATH, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
         return {}
     except Exception as e:
         print(f"Error loading cache: {e}")
@@ -50,19 +74,139 @@ def save_to_cache(song_key: str, song_data: Dict[str, Any]) -> None:
 # Load song cache
 song_cache = load_song_cache()
 
+def _is_arrow_string(arrow_type: Any) -> bool:
+    """Check whether an Arrow type is a (large) string type"""
+    return pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+
+def _arrow_string_dtype(arrow_type: Any) -> Optional[Any]:
+    """Keep Arrow string columns Arrow-backed instead of converting to Python objects"""
+    if _is_arrow_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+def _pca_features_frame(column: Any, field: Any, index: pd.Index) -> pd.DataFrame:
+    """
+    View a fixed-size list column written by export_dataframes_to_arrow as a DataFrame
+
+    The list values are one row-major float64 block, so the returned frame's
+    columns are views of the memory-mapped file rather than heap copies.
+
+    Args:
+        column: Chunked fixed_size_list<float64> column
+        field: Schema field of the column, holding the feature names
+        index: Index of the rows
+
+    Returns:
+        DataFrame with one float64 column per feature
+    """
+    names = json.loads(field.metadata[b'columns'])
+    values = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+    matrix = values.flatten().to_numpy().reshape(-1, len(names))
+    return pd.DataFrame(matrix, index=index, columns=names, copy=False)
+
+def load_dataframe(name: str, models_dir: str = MODELS_DIR) -> pd.DataFrame:
+    """
+    Load a saved DataFrame, preferring the memory-mapped Arrow IPC copy
+
+    The Arrow file is opened with a memory map. String columns stay Arrow-backed,
+    so their data is read from the OS page cache (shared between worker
+    processes) rather than copied onto the heap; missing values are filled with
+    '' so rows remain JSON-serializable. PCA features stored as one row-major
+    block are likewise viewed in place. Falls back to the pickle when pyarrow
+    or the Arrow file is missing.
+
+    Args:
+        name: Base file name without extension (e.g. 'df_pca')
+        models_dir: Directory containing the saved models
+
+    Returns:
+        The loaded DataFrame
+    """
+    arrow_path = os.path.join(models_dir, f'{name}.arrow')
+    if pa is not None and os.path.isfile(arrow_path):
+        table = pa.ipc.open_file(pa.memory_map(arrow_path, 'r')).read_all()
+        for i, field in enumerate(table.schema):
+            if _is_arrow_string(field.type) and table.column(i).null_count:
+                table = table.set_column(i, field, pc.fill_null(table.column(i), ''))
+        features_position = table.schema.get_field_index(PCA_FEATURES_COLUMN)
+        if features_position < 0:
+            return table.to_pandas(split_blocks=True, self_destruct=True,
+                                   types_mapper=_arrow_string_dtype)
+
+        features_field = table.schema.field(features_position)
+        features_column = table.column(features_position)
+        rest = table.remove_column(features_position).to_pandas(
+            split_blocks=True, types_mapper=_arrow_string_dtype)
+        df = _pca_features_frame(features_column, features_field, rest.index)
+        for column in rest.columns:
+            df.insert(len(df.columns), column, rest[column])
+        return df
+    return pd.read_pickle(os.path.join(models_dir, f'{name}.pkl'))
+
+def export_dataframes_to_arrow(models_dir: str = MODELS_DIR) -> List[str]:
+    """
+    One-shot conversion of the pickled DataFrames to uncompressed Arrow IPC files
+
+    The DataFrames are aligned and compacted exactly as load_components would
+    do it, so loading the Arrow files needs no further reindexing or copying.
+    df_pca is sorted by cluster and its PCA features are stored as a single
+    row-major float64 block, so each cluster's feature matrix is a contiguous
+    slice of the mapped file.
+
+    Args:
+        models_dir: Directory containing the saved models
+
+    Returns:
+        List of written file paths
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required to export DataFrames to Arrow")
+
+    df_pca = pd.read_pickle(os.path.join(models_dir, 'df_pca.pkl'))
+    df_pca, df_clean = fix_dataframe_alignment(
+        df_pca.sort_values('cluster', kind='stable'),
+        pd.read_pickle(os.path.join(models_dir, 'df_clean.pkl'))
+    )
+    frames = {'df_pca': df_pca, 'df_clean': compact_metadata(df_clean)}
+
+    feature_columns = [col for col in df_pca.columns if col != 'cluster']
+    features = np.ascontiguousarray(df_pca[feature_columns].to_numpy(dtype=np.float64))
+    features_field = pa.field(PCA_FEATURES_COLUMN, pa.list_(pa.float64(), len(feature_columns)),
+                              metadata={b'columns': json.dumps(feature_columns).encode()})
+    features_array = pa.FixedSizeListArray.from_arrays(pa.array(features.ravel()),
+                                                       len(feature_columns))
+
+    written = []
+    for name in ARROW_DATAFRAMES:
+        if name == 'df_pca':
+            table = pa.Table.from_pandas(df_pca.drop(columns=feature_columns), preserve_index=True)
+            table = table.append_column(features_field, features_array)
+        else:
+            table = pa.Table.from_pandas(frames[name], preserve_index=True)
+        # Fill string nulls once here instead of on every load
+        for i, field in enumerate(table.schema):
+            if _is_arrow_string(field.type) and table.column(i).null_count:
+                table = table.set_column(i, field, pc.fill_null(table.column(i), ''))
+        arrow_path = os.path.join(models_dir, f'{name}.arrow')
+        # A single record batch keeps every column in one contiguous buffer
+        feather.write_feather(table, arrow_path, compression='uncompressed',
+                              chunksize=max(table.num_rows, 1))
+        print(f"Wrote {arrow_path}")
+        written.append(arrow_path)
+    return written
+
 def load_components() -> Tuple[Any, Any, Any, Any, pd.DataFrame, pd.DataFrame, List[str]]:
     """Load all required ML components and data"""
     try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        models_dir = os.path.join(script_dir, 'models')
+        models_dir = MODELS_DIR
 
         # Load saved components
         kmeans = joblib.load(os.path.join(models_dir, 'kmeans_model.pkl'))
         pca = joblib.load(os.path.join(models_dir, 'pca_transformer.pkl'))
         scaler_opt = joblib.load(os.path.join(models_dir, 'standard_scaler.pkl'))
         scaler_tempo = joblib.load(os.path.join(models_dir, 'minmax_scaler_tempo.pkl'))
-        df_pca = pd.read_pickle(os.path.join(models_dir, 'df_pca.pkl'))
-        df_clean = pd.read_pickle(os.path.join(models_dir, 'df_clean.pkl'))
+        df_pca = load_dataframe('df_pca', models_dir)
+        df_clean = load_dataframe('df_clean', models_dir)
 
         # Load list of top features
         with open(os.path.join(models_dir, 'top_features.txt'), 'r') as f:
@@ -72,12 +216,117 @@ def load_components() -> Tuple[Any, Any, Any, Any, pd.DataFrame, pd.DataFrame, L
 
         # Fix data alignment issue
         df_pca, df_clean = fix_dataframe_alignment(df_pca, df_clean)
+        df_clean = compact_metadata(df_clean)
 
         return kmeans, pca, scaler_opt, scaler_tempo, df_pca, df_clean, top_features
     except Exception as e:
         print(f"Error loading components: {e}")
         raise
 
+def get_components() -> Tuple[Any, Any, Any, Any, pd.DataFrame, pd.DataFrame, List[str]]:
+    """Load all required ML components and data on first use and reuse them afterwards"""
+    global _components
+
+    if _components is None:
+        with _components_lock:
+            if _components is None:
+                _components = load_components()
+    return _components
+
+def build_cluster_matrices(df_pca: pd.DataFrame) -> Dict[Any, Tuple[pd.Index, np.ndarray]]:
+    """
+    Split the PCA features into one contiguous float64 matrix per cluster
+
+    float64 is what sklearn's KDTree stores internally, so the tree can use
+    these matrices directly instead of keeping a second converted copy. When
+    df_pca is sorted by cluster over a row-major float64 block (as loaded from
+    the Arrow export), each matrix is a view of that block rather than a copy.
+
+    Args:
+        df_pca: DataFrame with PCA features and cluster assignments
+
+    Returns:
+        Dictionary of cluster ID to (track IDs, feature matrix) tuples
+    """
+    features = df_pca.drop(columns='cluster').to_numpy(dtype=np.float64)
+    matrices = {}
+    for cluster, positions in df_pca.groupby('cluster').indices.items():
+        if positions[-1] - positions[0] + 1 == len(positions):
+            # Contiguous rows: slice instead of gathering them into a copy
+            positions = slice(positions[0], positions[-1] + 1)
+        matrices[cluster] = (df_pca.index[positions], np.ascontiguousarray(features[positions]))
+    return matrices
+
+def get_cluster_matrix(df_pca: pd.DataFrame, cluster: Any) -> Tuple[pd.Index, np.ndarray]:
+    """
+    Get the track IDs and PCA features of the songs in a cluster
+
+    Matrices are built once for the most recently used df_pca (normally the
+    one returned by get_components) instead of being sliced from the
+    DataFrame on every query.
+
+    Args:
+        df_pca: DataFrame with PCA features and cluster assignments
+        cluster: Cluster ID
+
+    Returns:
+        Tuple containing:
+            - Index of track IDs in the cluster
+            - C-contiguous float64 array of their PCA features
+    """
+    global _cluster_source, _cluster_matrices
+
+    if df_pca is not _cluster_source:
+        with _cluster_lock:
+            if df_pca is not _cluster_source:
+                _cluster_matrices = build_cluster_matrices(df_pca)
+                _cluster_source = df_pca
+
+    empty = (df_pca.index[:0], np.empty((0, df_pca.shape[1] - 1), dtype=np.float64))
+    return _cluster_matrices.get(cluster, empty)
+
+def get_cluster_tree(df_pca: pd.DataFrame, cluster: Any) -> Any:
+    """
+    Get a KD-tree over the PCA features of the songs in a cluster
+
+    Trees are built on first use for each cluster and reused, so nearest
+    neighbour queries no longer compute the distance to every song in the
+    cluster. The tree is built over (and shares memory with) the matrix from
+    get_cluster_matrix, so row positions match and no extra copy is kept.
+
+    Args:
+        df_pca: DataFrame with PCA features and cluster assignments
+        cluster: Cluster ID
+
+    Returns:
+        sklearn KDTree for the cluster
+    """
+    from sklearn.neighbors import KDTree
+
+    _, cluster_features = get_cluster_matrix(df_pca, cluster)
+    entry = _cluster_trees.get(cluster)
+    if entry is None or entry[0] is not cluster_features:
+        with _cluster_lock:
+            entry = _cluster_trees.get(cluster)
+            if entry is None or entry[0] is not cluster_features:
+                entry = (cluster_features, KDTree(cluster_features))
+                _cluster_trees[cluster] = entry
+    return entry[1]
+
+def build_search_indexes(df_pca: pd.DataFrame) -> None:
+    """
+    Build the per-cluster matrices and KD-trees for df_pca up front
+
+    Called while loading, so requests never pay the build cost and a
+    preloading server (gunicorn --preload) builds them once before forking
+    its workers.
+
+    Args:
+        df_pca: DataFrame with PCA features and cluster assignments
+    """
+    for cluster in df_pca['cluster'].unique():
+        get_cluster_tree(df_pca, cluster)
+
 def fix_dataframe_alignment(df_pca: pd.DataFrame, df_clean: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """Fix the data alignment issue between df_pca and df_clean"""
     try:
@@ -91,13 +340,19 @@ def fix_dataframe_alignment(df_pca: pd.DataFrame, df_clean: pd.DataFrame) -> Tup
         if df_pca.index.name != 'track_id':
             df_pca.index.name = 'track_id'
 
-        # Filter to common tracks
-        common_track_ids = set(df_pca.index).intersection(set(df_clean.index))
-        if not common_track_ids:
+        # Already aligned (e.g. exported by export_dataframes_to_arrow): keep the
+        # loaded frames as they are instead of copying them through .loc
+        if df_pca.index.is_unique and df_pca.index.equals(df_clean.index):
+            print(f"Dataframes already aligned on {len(df_pca)} tracks")
+            return df_pca, df_clean
+
+        # Filter to common tracks, keeping df_pca's order so it is the same in every process
+        common_track_ids = df_pca.index.intersection(df_clean.index)
+        if common_track_ids.empty:
             raise ValueError("No common track IDs found between dataframes!")
 
-        df_pca = df_pca.loc[list(common_track_ids)]
-        df_clean = df_clean.loc[list(common_track_ids)]
+        df_pca = df_pca.loc[common_track_ids]
+        df_clean = df_clean.loc[common_track_ids]
         print(f"Filtered dataframes to {len(common_track_ids)} common tracks")
 
         return df_pca, df_clean
@@ -106,6 +361,37 @@ def fix_dataframe_alignment(df_pca: pd.DataFrame, df_clean: pd.DataFrame) -> Tup
         print(f"Error fixing dataframe alignment: {e}")
         raise
 
+def compact_metadata(df_clean: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce df_clean to the metadata used for recommendations with compact dtypes
+
+    Drops the audio feature columns (recommendations only read metadata),
+    downcasts popularity to the smallest unsigned integer type, floats to
+    float32, and dictionary-encodes genre as a categorical. A frame that is
+    already compact (as exported to Arrow) is returned unchanged, without a copy.
+
+    Args:
+        df_clean: DataFrame with song metadata, indexed by track_id
+
+    Returns:
+        Compacted DataFrame
+    """
+    columns = [col for col in METADATA_COLUMNS if col in df_clean.columns]
+    if list(df_clean.columns) != columns:
+        df_clean = df_clean[columns]
+
+    changes = {}
+    if 'popularity' in columns:
+        popularity = pd.to_numeric(df_clean['popularity'], downcast='unsigned')
+        if popularity.dtype != df_clean['popularity'].dtype:
+            changes['popularity'] = popularity
+    for col in df_clean.select_dtypes(include='float64').columns:
+        changes[col] = changes.get(col, df_clean[col]).astype('float32')
+    if 'genre' in columns and not isinstance(df_clean['genre'].dtype, pd.CategoricalDtype):
+        changes['genre'] = df_clean['genre'].fillna('').astype('category')
+
+    return df_clean.assign(**changes) if changes else df_clean
+
 def authenticate_spotify() -> spotipy.Spotify:
     """Authenticate with Spotify API"""
     try:
@@ -285,6 +571,32 @@ def predict_cluster(pca_features: pd.DataFrame, kmeans: Any) -> int:
         print(f"Error predicting cluster: {e}")
         raise
 
+def top_k_indices(scores: np.ndarray, k: int, largest: bool = False) -> np.ndarray:
+    """
+    Get the indices of the k smallest (or largest) scores, in ranked order
+
+    Uses np.argpartition to select the top k in O(N) and only sorts those k,
+    instead of sorting every score.
+
+    Args:
+        scores: 1-D array of distances or similarities
+        k: Number of indices to return
+        largest: Rank by descending score (similarities) instead of ascending (distances)
+
+    Returns:
+        Array of at most k indices into scores
+    """
+    if largest:
+        scores = -scores
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.array([], dtype=int)
+    if k < len(scores):
+        candidates = np.argpartition(scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(scores[candidates], kind='stable')]
+
 def find_similar_songs(song_pca_features: pd.DataFrame, cluster: int, 
                       df_pca: pd.DataFrame, df_clean: pd.DataFrame, 
                       n_recommendations: int = 5) -> pd.DataFrame:
@@ -303,18 +615,17 @@ def find_similar_songs(song_pca_features: pd.DataFrame, cluster: int,
     """
     try:
         # Get songs in the same cluster
-        cluster_songs = df_pca[df_pca['cluster'] == cluster].drop('cluster', axis=1)
+        cluster_track_ids, _ = get_cluster_matrix(df_pca, cluster)
 
-        if len(cluster_songs) < n_recommendations:
-            print(f"Warning: Only {len(cluster_songs)} songs found in cluster {cluster}.")
-            n_recommendations = len(cluster_songs)
+        if len(cluster_track_ids) < n_recommendations:
+            print(f"Warning: Only {len(cluster_track_ids)} songs found in cluster {cluster}.")
+            n_recommendations = len(cluster_track_ids)
 
-        if len(cluster_songs) == 0:
+        if len(cluster_track_ids) == 0:
             print(f"No songs found in cluster {cluster}. Using random selection instead.")
             return get_random_recommendations(df_clean, n_recommendations)
 
-        # Calculate distances to all songs in the cluster with error handling
-        from sklearn.metrics.pairwise import euclidean_distances
+        # Find the nearest songs in the cluster with error handling
         import warnings
         import numpy as np
 
@@ -323,21 +634,23 @@ def find_similar_songs(song_pca_features: pd.DataFrame, cluster: int,
             warnings.simplefilter("ignore")
             np.seterr(all='ignore')
 
+            used_fallback = False
             try:
-                distances = euclidean_distances(song_pca_features, cluster_songs)[0]
                 # Handle any NaN or infinite values
-                distances = np.nan_to_num(distances, nan=1.0, posinf=1.0, neginf=0.0)
+                query = np.nan_to_num(np.asarray(song_pca_features, dtype=np.float64).reshape(1, -1))
+                # Indices of the most similar songs, nearest first
+                similar_indices = get_cluster_tree(df_pca, cluster).query(
+                    query, k=n_recommendations, return_distance=False)[0]
             except Exception as e:
-                print(f"Distance calculation failed, using fallback: {e}")
-                # Fallback to random distances
-                distances = np.random.random(len(cluster_songs))
+                print(f"Nearest neighbour search failed, using fallback: {e}")
+                used_fallback = True
+                # Fallback to random songs from the cluster
+                similar_indices = np.random.permutation(len(cluster_track_ids))[:n_recommendations]
             finally:
                 # Reset numpy error handling
                 np.seterr(all='warn')
 
-        # Get the indices of the most similar songs
-        similar_indices = np.argsort(distances)[:n_recommendations]
-        similar_track_ids = cluster_songs.iloc[similar_indices].index.tolist()
+        similar_track_ids = cluster_track_ids[similar_indices].tolist()
 
         # Get details of the recommended songs using track_id index
         valid_track_ids = [track_id for track_id in similar_track_ids if track_id in df_clean.index]
@@ -365,12 +678,33 @@ def find_similar_songs(song_pca_features: pd.DataFrame, cluster: int,
                 elif col == 'popularity':
                     recommendations_clean[col] = 0
 
-        return recommendations_clean
+        return mark_fallback(recommendations_clean) if used_fallback else recommendations_clean
 
     except Exception as e:
         print(f"Error finding similar songs: {e}")
         return get_random_recommendations(df_clean, n_recommendations)
 
+def mark_fallback(recommendations: pd.DataFrame) -> pd.DataFrame:
+    """Flag recommendations that were not found by searching from the requested song"""
+    recommendations.attrs[FALLBACK_ATTR] = True
+    return recommendations
+
+def is_fallback(recommendations: pd.DataFrame) -> bool:
+    """
+    Check whether recommendations came from a fallback method
+
+    Fallback results (random picks, a random or fuzzy-matched seed track, an
+    arbitrary ranking after a failed similarity search, or the error
+    placeholder) should not be cached as the answer for a query.
+
+    Args:
+        recommendations: DataFrame returned by the recommendation functions
+
+    Returns:
+        True if a fallback method produced the recommendations
+    """
+    return bool(recommendations.attrs.get(FALLBACK_ATTR, False))
+
 def get_random_recommendations(df_clean: pd.DataFrame, n_recommendations: int = 5) -> pd.DataFrame:
     """
     Helper function to get random recommendations when other methods fail
@@ -405,16 +739,16 @@ def get_random_recommendations(df_clean: pd.DataFrame, n_recommendations: int =
                 elif col == 'popularity':
                     recommendations_clean[col] = 0
 
-        return recommendations_clean
+        return mark_fallback(recommendations_clean)
     except Exception as e:
         print(f"Error getting random recommendations: {e}")
         # Return a dataframe with an error message
-        return pd.DataFrame({
+        return mark_fallback(pd.DataFrame({
             'track_name': ['Error finding recommendations'] * n_recommendations,
             'artist_name': ['Try another song'] * n_recommendations,
             'genre': [''] * n_recommendations,
             'popularity': [0] * n_recommendations
-        })
+        }))
 
 def recommend_songs_from_track_id(track_id: str, df_pca: pd.DataFrame, 
                                  df_clean: pd.DataFrame, 
@@ -437,9 +771,9 @@ def recommend_songs_from_track_id(track_id: str, df_pca: pd.DataFrame,
             return get_random_recommendations(df_clean, n_recommendations)
             
         cluster = df_pca.loc[track_id, 'cluster']
-        similar_songs = df_pca[df_pca['cluster'] == cluster].drop('cluster', axis=1)
+        cluster_track_ids, cluster_features = get_cluster_matrix(df_pca, cluster)
         
-        if len(similar_songs) <= 1:
+        if len(cluster_track_ids) <= 1:
             print("Not enough songs in the same cluster.")
             return get_random_recommendations(df_clean, n_recommendations)
             
@@ -448,7 +782,8 @@ def recommend_songs_from_track_id(track_id: str, df_pca: pd.DataFrame,
         import warnings
         import numpy as np
 
-        track_features = similar_songs.loc[track_id].values.reshape(1, -1)
+        position = cluster_track_ids.get_loc(track_id)
+        track_features = cluster_features[position:position + 1]
 
         # Suppress all mathematical warnings
         with warnings.catch_warnings():
@@ -456,25 +791,32 @@ def recommend_songs_from_track_id(track_id: str, df_pca: pd.DataFrame,
             # Also suppress numpy warnings specifically
             np.seterr(all='ignore')
 
+            used_fallback = False
             try:
-                similarities = cosine_similarity(track_features, similar_songs)[0]
+                similarities = cosine_similarity(track_features, cluster_features)[0]
                 # Handle any NaN or infinite values
                 similarities = np.nan_to_num(similarities, nan=0.0, posinf=1.0, neginf=0.0)
             except Exception as e:
                 print(f"Similarity calculation failed, using fallback: {e}")
+                used_fallback = True
                 # Fallback to simple distance calculation
-                similarities = np.ones(len(similar_songs)) * 0.5
+                similarities = np.ones(len(cluster_track_ids)) * 0.5
             finally:
                 # Reset numpy error handling
                 np.seterr(all='warn')
         
-        # Get top similar songs, ensuring they're in df_clean
-        sorted_indices = np.argsort(similarities)[::-1]
+        # Get top similar songs, ensuring they're in df_clean. One extra
+        # candidate is selected since the song itself is the most similar.
+        top_indices = top_k_indices(similarities, n_recommendations + 1, largest=True)
         similar_track_ids = []
-        for idx in sorted_indices[1:]:  # Skip the first one which is the song itself
-            candidate_track_id = similar_songs.index[idx]
-            if candidate_track_id in df_clean.index and len(similar_track_ids) < n_recommendations:
+        for idx in top_indices:
+            candidate_track_id = cluster_track_ids[idx]
+            if candidate_track_id == track_id:
+                continue
+            if candidate_track_id in df_clean.index:
                 similar_track_ids.append(candidate_track_id)
+            if len(similar_track_ids) == n_recommendations:
+                break
 
         if not similar_track_ids:
             print("Could not find similar songs in clean data.")
@@ -499,7 +841,7 @@ def recommend_songs_from_track_id(track_id: str, df_pca: pd.DataFrame,
                 elif col == 'popularity':
                     recommendations_clean[col] = 0
 
-        return recommendations_clean
+        return mark_fallback(recommendations_clean) if used_fallback else recommendations_clean
     
     except Exception as e:
         print(f"Error recommending songs: {e}")
@@ -519,8 +861,8 @@ def recommend_from_name(song_name: str, artist_name: Optional[str] = None,
         DataFrame with recommended songs
     """
     try:
-        # Load components
-        kmeans, pca, scaler_opt, scaler_tempo, df_pca, df_clean, top_features = load_components()
+        # Load components (only read from disk on the first call)
+        kmeans, pca, scaler_opt, scaler_tempo, df_pca, df_clean, top_features = get_components()
         
         # Authenticate with Spotify
         try:
@@ -559,12 +901,12 @@ def recommend_from_name(song_name: str, artist_name: Optional[str] = None,
     except Exception as e:
         print(f"Error in recommendation process: {e}")
         # Ensure we return a DataFrame rather than an error string
-        return pd.DataFrame({
+        return mark_fallback(pd.DataFrame({
             'track_name': ['Error in recommendation system'],
             'artist_name': ['Try another song'],
             'genre': [''],
             'popularity': [0]
-        })
+        }))
 
 def manual_selection_fallback(df_pca: pd.DataFrame, df_clean: pd.DataFrame, 
                              song_name: Optional[str] = None, 
@@ -607,7 +949,7 @@ def manual_selection_fallback(df_pca: pd.DataFrame, df_clean: pd.DataFrame,
                 
                 # Verify track_id is in df_pca before recommending
                 if track_id in df_pca.index:
-                    return recommend_songs_from_track_id(track_id, df_pca, df_clean, n_recommendations)
+                    return mark_fallback(recommend_songs_from_track_id(track_id, df_pca, df_clean, n_recommendations))
                 else:
                     print(f"Track ID {track_id} not found in PCA data. Using random selection instead.")
         
@@ -630,7 +972,7 @@ def manual_selection_fallback(df_pca: pd.DataFrame, df_clean: pd.DataFrame,
             print(f"Genre: {song_info['genre']}")
         
         # Get recommendations based on this track
-        return recommend_songs_from_track_id(sample_track_id, df_pca, df_clean, n_recommendations)
+        return mark_fallback(recommend_songs_from_track_id(sample_track_id, df_pca, df_clean, n_recommendations))
         
     except Exception as e:
         print(f"Error in manual selection fallback: {e}")
@@ -651,7 +993,7 @@ def manual_testing(song_name: Optional[str] = None) -> pd.DataFrame:
     """
     try:
         # Load components
-        _, _, _, _, df_pca, df_clean, _ = load_components()
+        _, _, _, _, df_pca, df_clean, _ = get_components()
         
         # Select a random song from dataset, ensuring it exists in both dataframes
         common_indices = set(df_pca.index).intersection(set(df_clean.index))
@@ -674,3 +1016,16 @@ def manual_testing(song_name: Optional[str] = None) -> pd.DataFrame:
     except Exception as e:
         print(f"Error in manual testing: {e}")
         return get_random_recommendations(df_clean)
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Spotify recommendation engine utilities")
+    parser.add_argument('--export-arrow', action='store_true',
+                        help="Convert df_pca.pkl/df_clean.pkl to memory-mappable Arrow files")
+    args = parser.parse_args()
+
+    if args.export_arrow:
+        export_dataframes_to_arrow()
+    else:
+        parser.print_help()
@@ -6,25 +6,139 @@ A robust Flask application with proper error handling and startup checks.
 
 import os
 import sys
+import json
+import gzip
+import hashlib
+import hmac
+import logging
+import random
 import traceback
 import socket
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple, Union
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple, Union
 
 # Add parent directory to path for imports
 current_dir = Path(__file__).parent
 parent_dir = current_dir.parent
 sys.path.insert(0, str(parent_dir))
 
-from flask import Flask, render_template, request, jsonify, Response
+import numpy as np
 import pandas as pd
+from flask import Flask, render_template, request, jsonify, Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to Flask's default JSON provider
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:  # Optional: responses are sent uncompressed
+    Compress = None
+
+from recommendation_engine import (
+    ARROW_AVAILABLE, ARROW_DATAFRAMES, build_search_indexes, get_components, is_fallback,
+    recommend_from_name,
+    recommend_songs_from_track_id, manual_selection_fallback
+)
+
+logger = logging.getLogger(__name__)
+
+# Input validation limits
+MAX_CONTENT_LENGTH = 4096  # bytes; larger request bodies are rejected with 413
+MAX_NAME_LENGTH = 200
+MIN_PLAYLIST_SIZE = 1
+MAX_PLAYLIST_SIZE = 20
+DEFAULT_EXAMPLE_COUNT = 3
+EXAMPLE_POOL_SIZE = 64
+RECOMMENDATION_CACHE_SIZE = 2048
+COMPRESS_LEVEL = 6
+
+# Fields returned for each recommendation, with defaults for missing values
+RECOMMENDATION_COLUMNS = ['track_name', 'artist_name', 'genre', 'popularity']
+RECOMMENDATION_DEFAULTS = {
+    'track_name': 'Unknown Track',
+    'artist_name': 'Unknown Artist',
+    'genre': '',
+    'popularity': 0
+}
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Types orjson does not handle natively (Decimal, etc.) use Flask's default hook
+        return orjson.dumps(
+            obj,
+            default=self.default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', os.urandom(24).hex())
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+# Token required by admin endpoints (sent as X-Admin-Token); unset disables them
+app.config['ADMIN_TOKEN'] = os.getenv('ADMIN_TOKEN')
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_LEVEL'] = COMPRESS_LEVEL
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+if Compress is not None:
+    Compress(app)
+
+def _error_body(message: str) -> bytes:
+    """Serialize a constant error payload once at import time"""
+    return json.dumps({'success': False, 'error': message}).encode()
+
+# Pre-serialized bodies for the fixed /recommend error responses
+_ERR_NO_DATA = _error_body('No data provided')
+_ERR_NO_SONG = _error_body('Please enter a song name')
+_ERR_NAME_NOT_TEXT = _error_body('Song and artist names must be text')
+_ERR_BAD_PLAYLIST_SIZE = _error_body('Playlist size must be a whole number')
+_ERR_SONG_TOO_LONG = _error_body(f'Song name must be at most {MAX_NAME_LENGTH} characters')
+_ERR_ARTIST_TOO_LONG = _error_body(f'Artist name must be at most {MAX_NAME_LENGTH} characters')
+_ERR_RECOMMENDATION_FAILED = _error_body(
+    'Unable to generate recommendations. Please try again with a different song.'
+)
+_ERR_BAD_JSON = _error_body('Request body must be valid JSON')
+_ERR_BODY_TOO_LARGE = _error_body(f'Request body must be at most {MAX_CONTENT_LENGTH} bytes')
+_ERR_NOT_JSON = _error_body('Request body must be sent as application/json')
+_ERR_NOT_FOUND = _error_body('Not found')
+_ERR_FORBIDDEN = _error_body('Invalid or missing admin token')
+
+def error_response(body: bytes, status: int) -> Response:
+    """Wrap a pre-serialized error body in a fresh JSON response"""
+    return Response(body, status=status, mimetype='application/json')
+
+# Errors raised by request.get_json() keep the API's JSON error shape
+@app.errorhandler(400)
+def bad_request(error: Exception) -> Response:
+    """Malformed JSON body"""
+    return error_response(_ERR_BAD_JSON, 400)
+
+@app.errorhandler(413)
+def request_too_large(error: Exception) -> Response:
+    """Body larger than MAX_CONTENT_LENGTH"""
+    return error_response(_ERR_BODY_TOO_LARGE, 413)
+
+@app.errorhandler(415)
+def unsupported_media_type(error: Exception) -> Response:
+    """Body not sent as JSON"""
+    return error_response(_ERR_NOT_JSON, 415)
 
 # Global variables to store loaded components
 components_loaded = False
+components_error = None
+_load_lock = threading.Lock()
 kmeans = None
 pca = None
 scaler_opt = None
@@ -32,6 +146,50 @@ scaler_tempo = None
 df_pca = None
 df_clean = None
 top_features = None
+track_index = None
+
+# Serialized recommendations per normalized (song, artist, playlist size), least recently used first
+_recommendation_cache: 'OrderedDict[Tuple[str, str, int], Tuple[Dict[str, Any], ...]]' = OrderedDict()
+_recommendation_cache_lock = threading.Lock()
+
+# Songs offered as examples in the search interface
+_POPULAR_SONGS: Tuple[Dict[str, str], ...] = (
+    {"song": "Bohemian Rhapsody", "artist": "Queen"},
+    {"song": "Billie Jean", "artist": "Michael Jackson"},
+    {"song": "Hotel California", "artist": "Eagles"},
+    {"song": "Imagine", "artist": "John Lennon"},
+    {"song": "Sweet Child O' Mine", "artist": "Guns N' Roses"},
+    {"song": "Stairway to Heaven", "artist": "Led Zeppelin"},
+    {"song": "Smells Like Teen Spirit", "artist": "Nirvana"},
+    {"song": "Like a Rolling Stone", "artist": "Bob Dylan"},
+    {"song": "Purple Haze", "artist": "Jimi Hendrix"},
+    {"song": "Good Vibrations", "artist": "The Beach Boys"},
+    {"song": "Respect", "artist": "Aretha Franklin"},
+    {"song": "Hey Jude", "artist": "The Beatles"},
+    {"song": "What's Going On", "artist": "Marvin Gaye"},
+    {"song": "Waterloo Sunset", "artist": "The Kinks"},
+    {"song": "I Want to Hold Your Hand", "artist": "The Beatles"},
+    {"song": "Dancing Queen", "artist": "ABBA"},
+    {"song": "Superstition", "artist": "Stevie Wonder"},
+    {"song": "Blinding Lights", "artist": "The Weeknd"},
+    {"song": "Shape of You", "artist": "Ed Sheeran"},
+    {"song": "Uptown Funk", "artist": "Mark Ronson ft. Bruno Mars"},
+    {"song": "Rolling in the Deep", "artist": "Adele"},
+    {"song": "Someone Like You", "artist": "Adele"},
+    {"song": "Lose Yourself", "artist": "Eminem"},
+    {"song": "Crazy in Love", "artist": "Beyoncé"},
+    {"song": "Halo", "artist": "Beyoncé"},
+    {"song": "Umbrella", "artist": "Rihanna"},
+    {"song": "Single Ladies", "artist": "Beyoncé"},
+    {"song": "Bad Romance", "artist": "Lady Gaga"},
+    {"song": "Poker Face", "artist": "Lady Gaga"},
+    {"song": "Viva La Vida", "artist": "Coldplay"}
+)
+
+def has_arrow_copy(file: str, present_files: set) -> bool:
+    """Check whether a pickled DataFrame can be loaded from its Arrow copy instead"""
+    name = Path(file).stem
+    return ARROW_AVAILABLE and name in ARROW_DATAFRAMES and f'{name}.arrow' in present_files
 
 def check_model_files() -> Tuple[bool, List[str]]:
     """
@@ -53,18 +211,27 @@ def check_model_files() -> Tuple[bool, List[str]]:
         'top_features.txt'
     ]
 
-    missing_files = [file for file in required_files if not (models_dir / file).exists()]
+    # One directory read instead of a stat() per required file
+    try:
+        with os.scandir(models_dir) as entries:
+            present_files = {entry.name for entry in entries}
+    except FileNotFoundError:
+        present_files = set()
+    missing_files = [
+        file for file in required_files
+        if file not in present_files and not has_arrow_copy(file, present_files)
+    ]
 
     if missing_files:
-        print("❌ Missing required model files:")
+        logger.error("❌ Missing required model files:")
         for file in missing_files:
-            print(f"   - {file}")
-        print("\n💡 To generate these files:")
-        print("   1. Open notebooks/main.ipynb in Jupyter")
-        print("   2. Run all cells to train models and save files")
+            logger.error("   - %s", file)
+        logger.error("💡 To generate these files:")
+        logger.error("   1. Open notebooks/main.ipynb in Jupyter")
+        logger.error("   2. Run all cells to train models and save files")
         return False, missing_files
 
-    print("✅ All required model files found")
+    logger.info("✅ All required model files found")
     return True, []
 
 def load_ml_components() -> Tuple[bool, Optional[str]]:
@@ -76,32 +243,37 @@ def load_ml_components() -> Tuple[bool, Optional[str]]:
             - Boolean indicating success
             - Error message if failed, None if successful
     """
-    global components_loaded, kmeans, pca, scaler_opt, scaler_tempo, df_pca, df_clean, top_features
+    global components_loaded, components_error, kmeans, pca, scaler_opt, scaler_tempo, df_pca, df_clean, top_features, track_index
 
     if components_loaded:
         return True, None
 
-    try:
-        files_exist, missing_files = check_model_files()
-        if not files_exist:
-            return False, f"Missing model files: {', '.join(missing_files)}"
-
-        from recommendation_engine import load_components
-        kmeans, pca, scaler_opt, scaler_tempo, df_pca, df_clean, top_features = load_components()
-        components_loaded = True
-        print("✅ ML components loaded successfully")
-        return True, None
+    # Serialize loading so concurrent requests never unpickle the models twice
+    with _load_lock:
+        if components_loaded:
+            return True, None
 
-    except ImportError as e:
-        error_msg = f"Import error: {e}"
-        print(f"❌ {error_msg}")
-        print("💡 Make sure recommendation_engine.py is in the src directory")
-        return False, error_msg
-    except Exception as e:
-        error_msg = f"Error loading ML components: {e}"
-        print(f"❌ {error_msg}")
-        print(f"💡 Error details: {traceback.format_exc()}")
-        return False, error_msg
+        try:
+            files_exist, missing_files = check_model_files()
+            if not files_exist:
+                components_error = f"Missing model files: {', '.join(missing_files)}"
+                return False, components_error
+
+            # Shared with the engine, so recommend_from_name reuses the same data
+            kmeans, pca, scaler_opt, scaler_tempo, df_pca, df_clean, top_features = get_components()
+            # Build lookup structures before serving (and before a preloading server forks)
+            build_search_indexes(df_pca)
+            track_index = build_track_index(df_clean)
+            components_loaded = True
+            components_error = None
+            logger.info("✅ ML components loaded successfully")
+            return True, None
+
+        except Exception as e:
+            components_error = f"Error loading ML components: {e}"
+            logger.error("❌ %s", components_error)
+            logger.debug("💡 Error details:", exc_info=True)
+            return False, components_error
 
 def get_popular_examples(count: int = 3) -> List[Dict[str, str]]:
     """
@@ -113,179 +285,391 @@ def get_popular_examples(count: int = 3) -> List[Dict[str, str]]:
     Returns:
         List of dictionaries with song and artist names
     """
-    popular_songs = [
-        {"song": "Bohemian Rhapsody", "artist": "Queen"},
-        {"song": "Billie Jean", "artist": "Michael Jackson"},
-        {"song": "Hotel California", "artist": "Eagles"},
-        {"song": "Imagine", "artist": "John Lennon"},
-        {"song": "Sweet Child O' Mine", "artist": "Guns N' Roses"},
-        {"song": "Stairway to Heaven", "artist": "Led Zeppelin"},
-        {"song": "Smells Like Teen Spirit", "artist": "Nirvana"},
-        {"song": "Like a Rolling Stone", "artist": "Bob Dylan"},
-        {"song": "Purple Haze", "artist": "Jimi Hendrix"},
-        {"song": "Good Vibrations", "artist": "The Beach Boys"},
-        {"song": "Respect", "artist": "Aretha Franklin"},
-        {"song": "Hey Jude", "artist": "The Beatles"},
-        {"song": "What's Going On", "artist": "Marvin Gaye"},
-        {"song": "Waterloo Sunset", "artist": "The Kinks"},
-        {"song": "I Want to Hold Your Hand", "artist": "The Beatles"},
-        {"song": "Dancing Queen", "artist": "ABBA"},
-        {"song": "Superstition", "artist": "Stevie Wonder"},
-        {"song": "Blinding Lights", "artist": "The Weeknd"},
-        {"song": "Shape of You", "artist": "Ed Sheeran"},
-        {"song": "Uptown Funk", "artist": "Mark Ronson ft. Bruno Mars"},
-        {"song": "Rolling in the Deep", "artist": "Adele"},
-        {"song": "Someone Like You", "artist": "Adele"},
-        {"song": "Lose Yourself", "artist": "Eminem"},
-        {"song": "Crazy in Love", "artist": "Beyoncé"},
-        {"song": "Halo", "artist": "Beyoncé"},
-        {"song": "Umbrella", "artist": "Rihanna"},
-        {"song": "Single Ladies", "artist": "Beyoncé"},
-        {"song": "Bad Romance", "artist": "Lady Gaga"},
-        {"song": "Poker Face", "artist": "Lady Gaga"},
-        {"song": "Viva La Vida", "artist": "Coldplay"}
-    ]
+    count = min(count, len(_POPULAR_SONGS))
+    return random.sample(_POPULAR_SONGS, count)
+
+def build_example_pool(count: int, size: int) -> List[Tuple[bytes, bytes, str]]:
+    """
+    Pre-serialize (and pre-compress) a pool of popular-examples responses
+
+    Args:
+        count: Number of examples in each response
+        size: Number of responses in the pool
+
+    Returns:
+        List of (JSON body, gzip-compressed body, ETag) tuples
+    """
+    pool = []
+    for _ in range(size):
+        body = json.dumps({'success': True, 'examples': get_popular_examples(count)}).encode()
+        gzip_body = gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0)
+        pool.append((body, gzip_body, hashlib.sha1(body).hexdigest()))
+    return pool
+
+@lru_cache(maxsize=None)
+def example_pool(count: int) -> Tuple[Tuple[bytes, bytes, str], ...]:
+    """
+    Get the ready-made popular-examples responses for a count, rotated at random
+
+    Each pool is built on first use and kept for the lifetime of the process.
+
+    Args:
+        count: Number of examples in each response
+
+    Returns:
+        Tuple of (JSON body, gzip-compressed body, ETag) tuples
+    """
+    return tuple(build_example_pool(count, EXAMPLE_POOL_SIZE))
+
+# Build the pool for the default example count at import time
+example_pool(DEFAULT_EXAMPLE_COUNT)
+
+def serialize_recommendations(recommendations: Any) -> List[Dict[str, Any]]:
+    """
+    Convert a recommendations DataFrame to JSON-ready records
+
+    Missing columns and values are filled with defaults in a single
+    vectorized pass instead of iterating rows.
+
+    Args:
+        recommendations: DataFrame returned by the recommendation engine
+
+    Returns:
+        List of dictionaries with track_name, artist_name, genre and popularity
+    """
+    return (recommendations
+            .reindex(columns=RECOMMENDATION_COLUMNS)
+            .fillna(RECOMMENDATION_DEFAULTS)
+            .to_dict(orient='records'))
+
+def normalize_query(value: str) -> str:
+    """
+    Normalize a song or artist name for use as a cache and lookup key
+
+    The key is only used for matching; the engine and Spotify are given the
+    names as entered.
+
+    Case is folded with str.casefold (which also handles non-ASCII case
+    variants) and surrounding or repeated whitespace is collapsed, all in C.
+
+    Args:
+        value: Song or artist name as entered
+
+    Returns:
+        Normalized key
+    """
+    return ' '.join(value.casefold().split())
+
+class TrackIndex(NamedTuple):
+    """Dataset tracks sorted by normalized name, for lookups by song name"""
+    keys: np.ndarray  # Normalized track names in sorted order
+    artist_keys: np.ndarray  # Normalized artist names of the same tracks
+    track_ids: np.ndarray  # Matching track IDs; most popular first among equal names
+
+def build_track_index(df_clean: Any) -> TrackIndex:
+    """
+    Index every dataset track by its normalized name
+
+    Built once at load time so songs that are already in the dataset can be
+    recommended without a Spotify lookup. Tracks sharing a name are all kept,
+    ordered by popularity (then track ID), so every process resolves a name
+    to the same track regardless of the DataFrame's row order.
+
+    Args:
+        df_clean: DataFrame with song metadata, indexed by track_id
+
+    Returns:
+        TrackIndex searchable with find_known_track
+    """
+    # Tracks without a name cannot be looked up by one
+    named = df_clean[df_clean['track_name'].notna()]
+    tracks = pd.DataFrame({
+        'key': [normalize_query(str(name)) for name in named['track_name'].tolist()],
+        'artist_key': [normalize_query(artist) if isinstance(artist, str) else ''
+                       for artist in named['artist_name'].tolist()],
+        'popularity': (named['popularity'].to_numpy() if 'popularity' in named.columns
+                       else np.zeros(len(named))),
+        'track_id': named.index.to_numpy(dtype=object)
+    })
+    tracks = tracks.sort_values(['key', 'popularity', 'track_id'],
+                                ascending=[True, False, True], kind='stable')
+    return TrackIndex(tracks['key'].to_numpy(dtype=object),
+                      tracks['artist_key'].to_numpy(dtype=object),
+                      tracks['track_id'].to_numpy(dtype=object))
+
+def find_known_track(song_key: str, artist_key: str) -> Optional[Any]:
+    """
+    Look up a normalized query in the dataset track index
+
+    Args:
+        song_key: Normalized song name
+        artist_key: Normalized artist name (empty string if not provided)
 
-    import random
-    count = min(count, len(popular_songs))
-    return random.sample(popular_songs, count)
+    Returns:
+        ID of the most popular dataset track with that name (and artist, when
+        given), or None if there is no such track
+    """
+    if track_index is None:
+        return None
+
+    start = np.searchsorted(track_index.keys, song_key, side='left')
+    stop = np.searchsorted(track_index.keys, song_key, side='right')
+    if start == stop:
+        return None
+    if not artist_key:
+        return track_index.track_ids[start]
+
+    matches = np.flatnonzero(track_index.artist_keys[start:stop] == artist_key)
+    if not len(matches):
+        return None
+    return track_index.track_ids[start + matches[0]]
+
+def get_recommendations(song_name: str, artist_name: str,
+                        playlist_size: int) -> List[Dict[str, Any]]:
+    """
+    Get serialized recommendations, memoized per normalized query
+
+    Only results found by searching from the requested song are cached.
+    Fallback results (e.g. while Spotify is unavailable) are often seeded from
+    a random track, so they are recomputed on the next request rather than
+    served until evicted.
+
+    Args:
+        song_name: Requested song name
+        artist_name: Requested artist name (empty string if not provided)
+        playlist_size: Number of recommendations to return
+
+    Returns:
+        List of recommendation dictionaries
+    """
+    key = (normalize_query(song_name), normalize_query(artist_name), playlist_size)
+    with _recommendation_cache_lock:
+        cached = _recommendation_cache.get(key)
+        if cached is not None:
+            _recommendation_cache.move_to_end(key)
+            return list(cached)
+
+    song_key, artist_key, _ = key
+    # Songs already in the dataset skip the Spotify lookup and are recommended
+    # from their stored PCA features (cosine similarity within their cluster)
+    track_id = find_known_track(song_key, artist_key)
+    if track_id is not None:
+        recommendations = recommend_songs_from_track_id(track_id, df_pca, df_clean, playlist_size)
+    else:
+        # The engine gets the names as entered: the normalized keys are only for
+        # lookups, and casefolding would change the text sent to Spotify
+        recommendations = recommend_from_name(song_name, artist_name or None, playlist_size)
+    records = tuple(serialize_recommendations(recommendations))
+
+    if not is_fallback(recommendations):
+        with _recommendation_cache_lock:
+            _recommendation_cache[key] = records
+            _recommendation_cache.move_to_end(key)
+            if len(_recommendation_cache) > RECOMMENDATION_CACHE_SIZE:
+                _recommendation_cache.popitem(last=False)
+    return list(records)
+
+@app.before_request
+def ensure_components_loaded() -> None:
+    """
+    Load ML components if startup loading did not run or failed
+
+    Handlers can then assume the loaded state; when loading fails the request
+    still proceeds and the app uses fallback methods.
+    """
+    if components_loaded:
+        return
+
+    success, error_msg = load_ml_components()
+    if not success:
+        logger.warning("ML components not loaded: %s", error_msg)
 
 @app.route('/')
 def index() -> str:
     """Main page"""
-    # Check if ML components are loaded before rendering the page
-    if not components_loaded:
-        success, error_msg = load_ml_components()
-        if not success:
-            print(f"Warning: ML components not loaded: {error_msg}")
-            # We'll still render the page, but the app will use fallback methods
-    
     return render_template('index.html')
 
 @app.route('/api/popular-examples')
 def popular_examples() -> Response:
     """API endpoint for getting random popular song examples"""
     try:
-        count = request.args.get('count', default=3, type=int)
+        count = request.args.get('count', default=DEFAULT_EXAMPLE_COUNT, type=int)
         count = max(1, min(count, 5))  # Limit between 1 and 5
-        
-        examples = get_popular_examples(count)
-        return jsonify({
-            'success': True,
-            'examples': examples
-        })
+
+        body, gzip_body, etag = random.choice(example_pool(count))
+        if request.accept_encodings.quality('gzip') > 0:
+            response = Response(gzip_body, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+            etag = f"{etag}-gzip"
+        else:
+            response = Response(body, mimetype='application/json')
+        response.vary.add('Accept-Encoding')
+        response.set_etag(etag)
+        return response.make_conditional(request)
     except Exception as e:
-        print(f"Error getting popular examples: {e}")
+        logger.error("Error getting popular examples: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+class RecommendationRequest(NamedTuple):
+    """Validated /recommend request fields"""
+    song_name: str
+    artist_name: str
+    playlist_size: int
+
+def parse_recommendation_request(data: Any) -> Tuple[Optional[RecommendationRequest], Optional[bytes]]:
+    """
+    Validate and normalize a /recommend request body in a single pass
+
+    Args:
+        data: Parsed JSON request body
+
+    Returns:
+        Tuple containing:
+            - Validated request, or None if invalid
+            - Pre-serialized error body if invalid, None if valid
+    """
+    if not data or not isinstance(data, dict):
+        return None, _ERR_NO_DATA
+
+    song_raw = data.get('song_name') or ''
+    artist_raw = data.get('artist_name') or ''
+    if not isinstance(song_raw, str) or not isinstance(artist_raw, str):
+        return None, _ERR_NAME_NOT_TEXT
+
+    # Check lengths before stripping so oversized input is never copied
+    if len(song_raw) > MAX_NAME_LENGTH:
+        return None, _ERR_SONG_TOO_LONG
+    if len(artist_raw) > MAX_NAME_LENGTH:
+        return None, _ERR_ARTIST_TOO_LONG
+
+    song_name = song_raw.strip()
+    if not song_name:
+        return None, _ERR_NO_SONG
+
+    raw_size = data.get('playlist_size', 5)
+    if isinstance(raw_size, bool):
+        return None, _ERR_BAD_PLAYLIST_SIZE
+    try:
+        # OverflowError: the stdlib JSON parser accepts Infinity and 1e400
+        playlist_size = int(raw_size)
+    except (TypeError, ValueError, OverflowError):
+        return None, _ERR_BAD_PLAYLIST_SIZE
+
+    # Ensure playlist size is reasonable
+    if not (MIN_PLAYLIST_SIZE <= playlist_size <= MAX_PLAYLIST_SIZE):
+        playlist_size = max(MIN_PLAYLIST_SIZE, min(playlist_size, MAX_PLAYLIST_SIZE))
+
+    return RecommendationRequest(song_name, artist_raw.strip(), playlist_size), None
+
 @app.route('/recommend', methods=['POST'])
 def recommend() -> Response:
     """API endpoint for getting recommendations"""
+    # Malformed, oversized or non-JSON bodies raise 400/413/415 from get_json,
+    # which the error handlers above turn into JSON error responses
+    recommendation_request, error_body = parse_recommendation_request(request.get_json())
+    if error_body is not None:
+        return error_response(error_body, 400)
+    song_name, artist_name, playlist_size = recommendation_request
+
     try:
-        # Get and validate form data
-        data = request.get_json()
-        if not data:
-            return jsonify({
-                'success': False,
-                'error': 'No data provided'
-            }), 400
-
-        song_name = data.get('song_name', '').strip()
-        artist_name = data.get('artist_name', '').strip()
-        playlist_size = int(data.get('playlist_size', 5))
+        # Get recommendations (repeated queries are served from the cache)
+        recommendations_list = get_recommendations(song_name, artist_name, playlist_size)
         
-        if not song_name:
-            return jsonify({
-                'success': False,
-                'error': 'Please enter a song name'
-            }), 400
+        return jsonify(recommendation_payload(
+            recommendations_list, song_name, artist_name, playlist_size
+        ))
         
-        # Ensure playlist size is reasonable
-        playlist_size = max(1, min(playlist_size, 20))
-        
-        # Ensure ML components are loaded
-        if not components_loaded:
-            success, error_msg = load_ml_components()
-            if not success:
-                print(f"Warning: Using fallback methods due to: {error_msg}")
-        
-        # Get recommendations
-        from recommendation_engine import recommend_from_name
-        recommendations = recommend_from_name(
+    except (FileNotFoundError, KeyError, ValueError) as e:
+        # Engine/model or song-specific failure: components were loaded at
+        # startup, so go straight to the dataset fallback
+        logger.warning("Could not recommend from %r: %s", song_name, e)
+        return fallback_recommendation_response(song_name, artist_name, playlist_size)
+    except Exception as e:
+        logger.error("Error in recommendation: %s", e)
+        logger.debug("Recommendation traceback:", exc_info=True)
+        return error_response(_ERR_RECOMMENDATION_FAILED, 500)
+
+def recommendation_payload(recommendations_list: List[Dict[str, Any]], song_name: str,
+                           artist_name: str, playlist_size: int) -> Dict[str, Any]:
+    """
+    Build the JSON payload for a successful /recommend response
+
+    The query is only echoed back as search_query when the client asks for
+    it with ?echo=1, since it already knows what it sent.
+
+    Args:
+        recommendations_list: Serialized recommendations
+        song_name: Requested song name
+        artist_name: Requested artist name (may be empty)
+        playlist_size: Number of recommendations requested
+
+    Returns:
+        Dictionary ready to be serialized with jsonify
+    """
+    payload = {
+        'success': True,
+        'recommendations': recommendations_list
+    }
+    if request.args.get('echo') == '1':
+        payload['search_query'] = {
+            'song_name': song_name,
+            'artist_name': artist_name if artist_name else None,
+            'playlist_size': playlist_size
+        }
+    return payload
+
+def fallback_recommendation_response(song_name: str, artist_name: str,
+                                     playlist_size: int) -> Response:
+    """
+    Build a /recommend response from the dataset-only fallback method
+
+    Args:
+        song_name: Requested song name
+        artist_name: Requested artist name (may be empty)
+        playlist_size: Number of recommendations to return
+
+    Returns:
+        JSON response with fallback recommendations, or a 500 error response
+    """
+    try:
+        recommendations = manual_selection_fallback(
+            df_pca, 
+            df_clean, 
             song_name, 
-            artist_name if artist_name else None, 
+            artist_name, 
             playlist_size
         )
         
-        # Convert to list of dictionaries for JSON response
-        recommendations_list = []
-        for _, row in recommendations.iterrows():
-            recommendations_list.append({
-                'track_name': row.get('track_name', 'Unknown Track'),
-                'artist_name': row.get('artist_name', 'Unknown Artist'),
-                'genre': row.get('genre', ''),
-                'popularity': row.get('popularity', 0)
-            })
-        
-        return jsonify({
-            'success': True,
-            'recommendations': recommendations_list,
-            'search_query': {
-                'song_name': song_name,
-                'artist_name': artist_name if artist_name else None,
-                'playlist_size': playlist_size
-            }
-        })
+        recommendations_list = serialize_recommendations(recommendations)
         
-    except Exception as e:
-        print(f"Error in recommendation: {e}")
-        print(traceback.format_exc())
+        payload = recommendation_payload(recommendations_list, song_name, artist_name, playlist_size)
+        payload['note'] = 'Used fallback recommendation method'
+        return jsonify(payload)
         
-        # Try fallback method
-        try:
-            if not components_loaded:
-                success, _ = load_ml_components()
-                if not success:
-                    print("Warning: Components still not loaded, using minimal fallback")
-
-            from recommendation_engine import manual_selection_fallback
-            recommendations = manual_selection_fallback(
-                df_pca, 
-                df_clean, 
-                song_name, 
-                artist_name, 
-                playlist_size
-            )
-            
-            recommendations_list = []
-            for _, row in recommendations.iterrows():
-                recommendations_list.append({
-                    'track_name': row.get('track_name', 'Unknown Track'),
-                    'artist_name': row.get('artist_name', 'Unknown Artist'),
-                    'genre': row.get('genre', ''),
-                    'popularity': row.get('popularity', 0)
-                })
-            
-            return jsonify({
-                'success': True,
-                'recommendations': recommendations_list,
-                'search_query': {
-                    'song_name': song_name,
-                    'artist_name': artist_name if artist_name else None,
-                    'playlist_size': playlist_size
-                },
-                'note': 'Used fallback recommendation method'
-            })
-            
-        except Exception as fallback_error:
-            print(f"Fallback also failed: {fallback_error}")
-            return jsonify({
-                'success': False,
-                'error': 'Unable to generate recommendations. Please try again with a different song.'
-            }), 500
+    except Exception as fallback_error:
+        logger.error("Fallback also failed: %s", fallback_error)
+        return error_response(_ERR_RECOMMENDATION_FAILED, 500)
+
+@app.route('/cache/clear', methods=['POST'])
+def clear_cache() -> Response:
+    """Admin endpoint for invalidating cached recommendations (requires ADMIN_TOKEN)"""
+    admin_token = app.config['ADMIN_TOKEN']
+    if not admin_token:
+        return error_response(_ERR_NOT_FOUND, 404)
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), admin_token):
+        return error_response(_ERR_FORBIDDEN, 403)
+
+    with _recommendation_cache_lock:
+        cleared = len(_recommendation_cache)
+        _recommendation_cache.clear()
+    logger.info("Cleared %d cached recommendation results", cleared)
+    return jsonify({
+        'success': True,
+        'cleared': cleared
+    })
 
 @app.route('/health')
 def health_check() -> Response:
@@ -295,23 +679,22 @@ def health_check() -> Response:
             'status': 'healthy',
             'components_loaded': components_loaded,
             'python_version': sys.version,
-            'timestamp': pd.Timestamp.now().isoformat()
+            'timestamp': datetime.now(timezone.utc).isoformat()
         }
         
         if not components_loaded:
-            success, error_msg = load_ml_components()
-            if not success:
-                status_info['status'] = 'degraded'
-                status_info['message'] = f'Failed to load ML components: {error_msg}'
-                return jsonify(status_info), 503  # Service Unavailable
+            status_info['status'] = 'degraded'
+            status_info['message'] = f'Failed to load ML components: {components_error}'
+            return jsonify(status_info), 503  # Service Unavailable
 
         return jsonify(status_info)
     except Exception as e:
         error_info = {
             'status': 'error',
-            'message': str(e),
-            'traceback': traceback.format_exc()
+            'message': str(e)
         }
+        if logger.isEnabledFor(logging.DEBUG):
+            error_info['traceback'] = traceback.format_exc()
         return jsonify(error_info), 500
 
 def find_available_port(start_port: int = 5000, max_attempts: int = 10) -> int:
@@ -331,20 +714,32 @@ def find_available_port(start_port: int = 5000, max_attempts: int = 10) -> int:
     for port in range(start_port, start_port + max_attempts):
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                # Allow ports left in TIME_WAIT by a previous (crashed) run. Not on
+                # Windows, where SO_REUSEADDR also binds to ports in active use
+                if os.name != 'nt':
+                    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
                 s.bind(('', port))
                 return port
         except OSError:
             continue
     raise RuntimeError(f"Could not find an available port after {max_attempts} attempts")
 
+def configure_logging() -> None:
+    """Configure root logging from the LOG_LEVEL environment variable"""
+    logging.basicConfig(
+        level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+
 def start_app() -> None:
     """Start the Flask application"""
+    configure_logging()
     try:
-        # Try to load ML components, but continue even if it fails
+        # Load ML components before serving; fail fast if they are unavailable
         success, error_msg = load_ml_components()
         if not success:
-            print(f"⚠️ Warning: ML components not loaded: {error_msg}")
-            print("⚠️ The application will use fallback methods for recommendations")
+            logger.error("❌ ML components could not be loaded: %s", error_msg)
+            sys.exit(1)
         
         # Determine environment
         flask_env = os.getenv('FLASK_ENV', 'production')
@@ -355,11 +750,31 @@ def start_app() -> None:
         port = find_available_port(start_port=start_port)
         
         # Start server
-        print(f"🚀 Starting server on port {port} in {flask_env} mode")
-        app.run(host='0.0.0.0', port=port, debug=debug_mode)
+        logger.info("🚀 Starting server on port %d in %s mode", port, flask_env)
+        if debug_mode:
+            # Development server only binds locally; never expose the debugger.
+            # The reloader is disabled since it would load every model file twice.
+            app.run(host='127.0.0.1', port=port, debug=True, use_reloader=False)
+            return
+
+        try:
+            from waitress import serve
+        except ImportError:
+            logger.warning("⚠️ waitress is not installed, falling back to the Flask development server")
+            logger.warning("💡 Install it with: pip install waitress")
+            app.run(host='0.0.0.0', port=port, debug=False)
+            return
+
+        serve(
+            app,
+            host='0.0.0.0',
+            port=port,
+            threads=int(os.getenv('WEB_THREADS', max(4, os.cpu_count() or 1))),
+            connection_limit=1000,
+            channel_timeout=30
+        )
     except Exception as e:
-        print(f"❌ Error starting app: {e}")
-        print(traceback.format_exc())
+        logger.exception("❌ Error starting app: %s", e)
         sys.exit(1)
 
 if __name__ == '__main__':
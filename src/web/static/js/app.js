@@ -96,7 +96,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 const result = await response.json();
 
                 if (result.success) {
-                    showResults(result);
+                    showResults(result, data);
                     // Log successful search for analytics
                     console.log(`Search successful: ${data.song_name} by ${data.artist_name || 'unknown'}`);
 
@@ -393,11 +393,11 @@ document.addEventListener('DOMContentLoaded', function() {
     /**
      * Display recommendation results
      * @param {Object} result - The API response with recommendations
+     * @param {Object} query - The submitted search (song_name, artist_name)
      */
-    function showResults(result) {
+    function showResults(result, query) {
         // Update search info
         const searchInfo = document.getElementById('searchInfo');
-        const query = result.search_query;
 
         let searchText = `Found ${result.recommendations.length} AI-powered recommendations for "${query.song_name}"`;
         if (query.artist_name) {
@@ -424,7 +424,7 @@ document.addEventListener('DOMContentLoaded', function() {
         });
 
         // Initialize action buttons
-        initializeActionButtons(result);
+        initializeActionButtons(result, query);
 
         // Show results with animation
         resultsContainer.style.display = 'block';
@@ -535,12 +535,12 @@ document.addEventListener('DOMContentLoaded', function() {
     /**
      * Initialize action buttons for the results section
      * @param {Object} result - The API response with recommendations
+     * @param {Object} query - The submitted search (song_name, artist_name)
      */
-    function initializeActionButtons(result) {
+    function initializeActionButtons(result, query) {
         // Share button
         const shareBtn = document.getElementById('shareBtn');
         shareBtn.addEventListener('click', function() {
-            const query = result.search_query;
             const shareText = `Check out this AI-generated playlist based on "${query.song_name}"${query.artist_name ? ` by ${query.artist_name}` : ''}! 🎵`;
 
             try {
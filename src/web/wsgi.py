@@ -0,0 +1,22 @@
+"""
+WSGI entry point for production servers such as gunicorn:
+
+    gunicorn -w 4 -k gthread --threads 4 --preload --chdir src/web wsgi:application
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app import app, configure_logging, load_ml_components
+
+configure_logging()
+
+# Load models and build the search indexes at import, so with --preload this
+# happens once before the workers fork; refuse to start without them
+success, error_msg = load_ml_components()
+if not success:
+    raise RuntimeError(f"ML components could not be loaded: {error_msg}")
+
+application = app